@@ -1,6 +1,10 @@
 import streamlit as st
 import wikipedia
 import re
+import urllib.parse
+from wiki_utils import clean_query, init_wikipedia, search_wikipedia
+
+_YEAR = re.compile(r"(19|20)\d{2}")
 
 st.set_page_config(page_title="Movie Plot Finder", layout="centered")
 st.title("🎬 Movie Plot Finder")
@@ -12,18 +16,15 @@ with st.sidebar:
     sentences = st.slider("Summary length (sentences)", 1, 6, 3)
     show_all_hits = st.checkbox("Show top Wikipedia matches", value=True)
 
+init_wikipedia("en")
+
 # User input
 query = st.text_input("Enter a movie name (e.g. Inception, Avatar (2009 film))")
 
-def search_wikipedia(q):
-    try:
-        return wikipedia.search(q, results=10)
-    except Exception:
-        return []
-
 def get_summary(title, sentences=3):
     try:
-        return wikipedia.summary(title, sentences=sentences)
+        # title is already an exact search hit; auto_suggest would only add a search round-trip
+        return wikipedia.summary(title, sentences=sentences, auto_suggest=False)
     except wikipedia.DisambiguationError as e:
         raise
     except wikipedia.PageError:
@@ -33,28 +34,29 @@ def get_summary(title, sentences=3):
 
 if st.button("Get Plot"):
     # clean user input: strip whitespace and trailing punctuation
-    q = (query or "").strip()
-    q = re.sub(r"[.,;:!?]+$", "", q)   # remove trailing punctuation like "," "." "?" "!"
+    q = clean_query(query)
     if not q:
         st.warning("Please enter a movie name.")
         st.stop()
 
     st.info(f"Searching Wikipedia for: {q}")
-    hits = search_wikipedia(q)
+    # 6 hits: enough for the match list and for finding a film/year hit as the default
+    try:
+        hits = search_wikipedia(q, results=6)
+    except Exception:
+        hits = []
 
     if not hits:
         st.error(f"No results for \"{q}\". Try adding the year (e.g. 'Avatar (2009 film)').")
         st.stop()
 
     # Pick best match
-    chosen = None
-    for h in hits:
-        if h.lower() == q.lower():
-            chosen = h
-            break
+    lowered = [h.lower() for h in hits]
+    q_lower = q.lower()
+    chosen = next((h for h, low in zip(hits, lowered) if low == q_lower), None)
     if not chosen:
-        for h in hits:
-            if "film" in h.lower() or any(str(y) in h for y in range(1900, 2031)):
+        for h, low in zip(hits, lowered):
+            if "film" in low or _YEAR.search(h):
                 chosen = h
                 break
     if not chosen:
@@ -83,5 +85,5 @@ if st.button("Get Plot"):
     st.markdown("### Plot / Summary")
     st.write(summary)
 
-    url = "https://en.wikipedia.org/wiki/" + chosen.replace(" ", "_")
+    url = "https://en.wikipedia.org/wiki/" + urllib.parse.quote(chosen.replace(" ", "_"))
     st.markdown(f"[Read full Wikipedia page →]({url})")
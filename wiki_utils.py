@@ -0,0 +1,178 @@
+# wiki_utils.py
+"""
+Shared Wikipedia helpers for the Streamlit apps.
+The module is imported, not re-executed on reruns. Each app still runs as its own
+`streamlit run` process, so the apps share only the on-disk HTTP cache.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests_cache
+import streamlit as st
+import wikipedia
+import wikipediaapi
+from requests.adapters import HTTPAdapter
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from urllib3.util.retry import Retry
+
+# st.cache_data key for wikipediaapi pages: identity without touching the network
+_PAGE_HASH = {wikipediaapi.WikipediaPage: lambda p: (p.language, p.title)}
+# section titles tried for the plot, in order; already normalized like section_index keys
+_PLOT_SECTIONS = ("plot", "plot summary", "synopsis", "synopsis and plot", "plot and synopsis")
+
+@st.cache_resource
+def get_http_session():
+    """One pooled keep-alive session shared by every Wikipedia call (survives reruns).
+
+    Responses are also kept in a local SQLite cache for a day, so repeat queries skip
+    the network even after the app restarts.
+    """
+    session = requests_cache.CachedSession("wiki_cache", backend="sqlite", expire_after=86400,
+                                           allowable_methods=("GET",))
+    session.headers["User-Agent"] = "movie-plot-app/1.0"
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10,
+                          max_retries=Retry(total=2, backoff_factor=0.3))
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_resource
+def init_wikipedia(lang: str = "en"):
+    """Configure the `wikipedia` package once per language.
+
+    set_lang() also flushes the package's memoized search/summary results, so it must
+    not run on every rerun.
+    """
+    # the package calls requests.get() through its module global; route it via the pool
+    wikipedia.wikipedia.requests = get_http_session()
+    wikipedia.set_lang(lang)
+    # set_lang() builds an http:// URL, which costs a redirect on every call
+    wikipedia.wikipedia.API_URL = f"https://{lang}.wikipedia.org/w/api.php"
+
+@st.cache_resource
+def get_wiki_api(lang: str = "en"):
+    """Shared wikipediaapi client for `lang`, reused across reruns.
+
+    Must not be rebuilt per rerun: wikipedia-api 0.5.8 closes its session in __del__,
+    so every discarded client would close the shared pool.
+    """
+    client = wikipediaapi.Wikipedia(language=lang)
+    client._session = get_http_session()  # wikipedia-api 0.5.x has no session= argument
+    return client
+
+def clean_query(q: str) -> str:
+    if not q:
+        return ""
+    return q.strip().rstrip(".,;:!?")
+
+@st.cache_data(show_spinner=False)
+def search_wikipedia(q: str, results: int = 10):
+    # errors propagate (st.cache_data does not cache them) so a transient failure
+    # is not remembered as "no results"; callers handle them
+    return wikipedia.search(q, results=results)
+
+@st.cache_data(show_spinner=False)
+def wiki_query(titles: tuple, sentences: int = 3, lang: str = "en"):
+    """One MediaWiki action=query call: intro extract, url and disambiguation flag per title."""
+    r = get_http_session().get(f"https://{lang}.wikipedia.org/w/api.php", params={
+        "action": "query",
+        "format": "json",
+        "formatversion": 2,
+        "titles": "|".join(titles),
+        "prop": "extracts|info|pageprops",
+        "exintro": 1,
+        "explaintext": 1,
+        "exsentences": sentences,
+        "exlimit": "max",
+        "inprop": "url",
+        "ppprop": "disambiguation",
+        "redirects": 1,
+    })
+    r.raise_for_status()
+    return r.json()["query"]["pages"]
+
+# cache_resource, not cache_data: the page holds the client (and its sqlite-backed session),
+# which cannot be pickled
+@st.cache_resource(show_spinner=False)
+def get_wikipedia_page_via_api(title: str, lang: str = "en"):
+    page = get_wiki_api(lang).page(title)
+    # wikipediaapi pages are lazy; load info + sections now so the fetch happens in the
+    # worker thread and the cached page already carries the content
+    if page.exists():
+        page.sections
+    return page
+
+def section_index(page):
+    """Map lower-cased section title -> text for the whole section tree, built once per page.
+
+    Walks the tree iteratively in document order; the first non-empty section wins.
+    """
+    out = {}
+    stack = list(reversed(page.sections))
+    while stack:
+        s = stack.pop()
+        key = s.title.strip().lower()
+        if s.text and key not in out:
+            out[key] = s.text
+        stack.extend(reversed(s.sections))
+    return out
+
+@st.cache_data(show_spinner=False, max_entries=256, hash_funcs=_PAGE_HASH)
+def extract_plot_from_api_page(page):
+    """Try common section names in order."""
+    if not page or not page.exists():
+        return None
+    idx = section_index(page)
+    for candidate in _PLOT_SECTIONS:
+        t = idx.get(candidate)
+        if t and len(t.strip()) > 80:
+            return t.strip()
+    # If no suitable section found, fallback to first paragraphs of the page text
+    txt = page.text or ""
+    paragraphs = [p.strip() for p in txt.split("\n\n") if p.strip()]
+    return paragraphs[0].strip() if paragraphs else None
+
+def _attach_script_run_ctx(ctx):
+    """ThreadPoolExecutor initializer: let worker threads call the Streamlit caches."""
+    add_script_run_ctx(threading.current_thread(), ctx)
+
+def try_summary_or_fallback(title: str, sentences: int = 3, prefer_plot: bool = True,
+                            lang: str = "en"):
+    """Try to return (text, url). Uses structured Plot via wikipediaapi first if prefer_plot.
+
+    Summary and url come from a single action=query request, issued concurrently with
+    the wikipediaapi page fetch.
+    """
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=2, initializer=_attach_script_run_ctx, initargs=(ctx,)) as ex:
+        api_future = ex.submit(get_wikipedia_page_via_api, title, lang)
+        query_future = ex.submit(wiki_query, (title,), sentences, lang)
+        try:
+            # If prefer_plot is True, attempt to use the structured plot first
+            if prefer_plot:
+                api_page = api_future.result()
+                if api_page.exists():
+                    plot_text = extract_plot_from_api_page(api_page)
+                    if plot_text and len(plot_text) > 120:
+                        return plot_text, api_page.fullurl
+            # Next try the intro extract (short) + url from the same response
+            info = query_future.result()[0]
+            if "disambiguation" in info.get("pageprops", {}):
+                # let the wikipedia package raise with the options list the UI expects
+                wikipedia.page(title, auto_suggest=False)
+            if info.get("extract"):
+                return info["extract"], info.get("fullurl")
+        except wikipedia.DisambiguationError as de:
+            # propagate so UI can handle options
+            raise
+        except Exception:
+            pass
+        # last-resort: use the api page and extract something
+        try:
+            api_page = api_future.result()
+            if api_page.exists():
+                plot_text = extract_plot_from_api_page(api_page)
+                return plot_text, api_page.fullurl
+        except Exception:
+            pass
+    return None, None